@@ -147,6 +147,9 @@ gf()
 ./bin/FreeCADCmd --run-test "femtest.testobject.TestObjectType.test_femobjects_isoftype"
 ./bin/FreeCADCmd --run-test "femtest.testobject.TestObjectType.test_femobjects_derivedfromfem"
 ./bin/FreeCADCmd --run-test "femtest.testobject.TestObjectType.test_femobjects_derivedfromstd"
+./bin/FreeCADCmd --run-test "femtest.testobject.TestObjectType.test_femutils_findanalysis_nestedgroups"
+./bin/FreeCADCmd --run-test "femtest.testobject.TestObjectType.test_femutils_findanalysis_documentchanges"
+./bin/FreeCADCmd --run-test "femtest.testobject.TestObjectType.test_femutils_type_proxynotset"
 ./bin/FreeCADCmd --run-test "femtest.testresult.TestResult.test_read_frd_massflow_networkpressure"
 ./bin/FreeCADCmd --run-test "femtest.testresult.TestResult.test_stress_von_mises"
 ./bin/FreeCADCmd --run-test "femtest.testresult.TestResult.test_stress_principal_std"
@@ -233,6 +236,15 @@ unittest.TextTestRunner().run(unittest.TestLoader().loadTestsFromName("femtest.t
 import unittest
 unittest.TextTestRunner().run(unittest.TestLoader().loadTestsFromName("femtest.testobject.TestObjectType.test_femobjects_derivedfromstd"))
 
+import unittest
+unittest.TextTestRunner().run(unittest.TestLoader().loadTestsFromName("femtest.testobject.TestObjectType.test_femutils_findanalysis_nestedgroups"))
+
+import unittest
+unittest.TextTestRunner().run(unittest.TestLoader().loadTestsFromName("femtest.testobject.TestObjectType.test_femutils_findanalysis_documentchanges"))
+
+import unittest
+unittest.TextTestRunner().run(unittest.TestLoader().loadTestsFromName("femtest.testobject.TestObjectType.test_femutils_type_proxynotset"))
+
 import unittest
 unittest.TextTestRunner().run(unittest.TestLoader().loadTestsFromName("femtest.testresult.TestResult.test_read_frd_massflow_networkpressure"))
 
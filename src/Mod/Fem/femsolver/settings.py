@@ -151,6 +151,10 @@ def get_write_comments(name):
 
 
 # ******** working directory parameter ***********************************************************
+def get_general_param_group():
+    return FreeCAD.ParamGet(_GENERAL_PARAM)
+
+
 def get_custom_dir():
     param_group = FreeCAD.ParamGet(_GENERAL_PARAM)
     return param_group.GetString("CustomDirectoryPath")
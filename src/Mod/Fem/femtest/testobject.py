@@ -1399,6 +1399,77 @@ class TestObjectType(unittest.TestCase):
         )
         # is = 44 tests (just copy in empty file to test)
 
+    # ********************************************************************************************
+    def test_femutils_findanalysis_nestedgroups(
+        self
+    ):
+        # the member is in the second of two subgroups, the first one is empty
+        doc = self.active_doc
+
+        from femtools.femutils import findAnalysisOfMember
+
+        analysis = ObjectsFem.makeAnalysis(doc)
+        group = doc.addObject("App::DocumentObjectGroup", "Group")
+        subgroup_empty = doc.addObject("App::DocumentObjectGroup", "SubGroupEmpty")
+        subgroup_member = doc.addObject("App::DocumentObjectGroup", "SubGroupMember")
+        member = ObjectsFem.makeConstraintFixed(doc)
+        subgroup_member.addObject(member)
+        group.addObject(subgroup_empty)
+        group.addObject(subgroup_member)
+        analysis.addObject(group)
+
+        self.assertEqual(
+            analysis,
+            findAnalysisOfMember(member)
+        )
+
+    # ********************************************************************************************
+    def test_femutils_findanalysis_documentchanges(
+        self
+    ):
+        # the cached document index has to follow added and removed analyses
+        doc = self.active_doc
+
+        from femtools.femutils import findAnalysisOfMember
+
+        member = ObjectsFem.makeConstraintFixed(doc)
+        self.assertIsNone(findAnalysisOfMember(member))
+
+        # analysis created after the first call
+        analysis = ObjectsFem.makeAnalysis(doc)
+        analysis.addObject(member)
+        self.assertEqual(
+            analysis,
+            findAnalysisOfMember(member)
+        )
+
+        # deleted analysis
+        doc.removeObject(analysis.Name)
+        self.assertIsNone(findAnalysisOfMember(member))
+
+    # ********************************************************************************************
+    def test_femutils_type_proxynotset(
+        self
+    ):
+        # the steps of ObjectsFem.makeMaterialSolid, type_of_obj is called
+        # after addObject but before the Proxy is set
+        # the TypeId returned before must not be cached
+        doc = self.active_doc
+
+        from femtools.femutils import type_of_obj
+        from femobjects import _FemMaterial
+
+        obj = doc.addObject("App::MaterialObjectPython", "MechanicalSolidMaterial")
+        self.assertEqual(
+            "App::MaterialObjectPython",
+            type_of_obj(obj)
+        )
+        _FemMaterial._FemMaterial(obj)
+        self.assertEqual(
+            "Fem::Material",
+            type_of_obj(obj)
+        )
+
     # ********************************************************************************************
     def tearDown(
         self
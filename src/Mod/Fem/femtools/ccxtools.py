@@ -378,7 +378,7 @@ class FemToolsCcx(QtCore.QRunnable, QtCore.QObject):
                 has_no_references = True
         mat_ref_shty = ""
         for m in self.materials_linear:
-            ref_shty = femutils.get_refshape_type(m["Object"])
+            ref_shty = m["RefShapeType"]
             if not mat_ref_shty:
                 mat_ref_shty = ref_shty
             if mat_ref_shty and ref_shty and ref_shty != mat_ref_shty:
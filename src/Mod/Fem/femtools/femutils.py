@@ -27,10 +27,15 @@ __author__ = "Markus Hovorka, Bernd Hahnebach"
 __url__ = "http://www.freecadweb.org"
 
 
+import errno
 import os
 import sys
+from tempfile import mkdtemp
+
+import numpy as np
 
 import FreeCAD
+import femmesh.meshtools as FemMeshTools
 from femsolver import settings
 # from femsolver.run import _getUniquePath as getUniquePath
 if FreeCAD.GuiUp:
@@ -50,74 +55,145 @@ def createObject(doc, name, proxy, viewProxy):
 def findAnalysisOfMember(member):
     if member is None:
         raise ValueError("Member must not be None")
-    for obj in member.Document.Objects:
-        if obj.isDerivedFrom("Fem::FemAnalysis"):
-            if member in obj.Group:
-                return obj
-            if _searchGroups(member, obj.Group):
-                return obj
+    # one walk per analysis finds direct and nested members,
+    # groups shared between analyses are only searched once
+    visited = set()
+    for obj in _get_document_index(member.Document)["Fem::FemAnalysis"]:
+        if _searchGroups(member, obj.Group, visited):
+            return obj
     return None
 
 
-def _searchGroups(member, objs):
-    for o in objs:
-        if o == member:
+def _searchGroups(member, objs, visited=None):
+    visited = set() if visited is None else visited
+    stack = list(objs)
+    while stack:
+        o = stack.pop()
+        oid = id(o)
+        if oid in visited:
+            continue
+        visited.add(oid)
+        if o is member:
             return True
-        if hasattr(o, "Group"):
-            return _searchGroups(member, o.Group)
+        grp = getattr(o, "Group", None)
+        if grp:
+            stack.extend(grp)
     return False
 
 
-def get_member(analysis, t):
+# coarse type index, every object is checked against these types only once
+_INDEX_TYPES = ("Fem::FemAnalysis", "Fem::FemMeshObject")
+# document name --> type index of the document objects
+_document_index = {}
+
+
+def _index_by_type(objs):
+    """returns a dict with the objects binned by the types in _INDEX_TYPES"""
+    index = dict((t, []) for t in _INDEX_TYPES)
+    for o in objs:
+        for t in _INDEX_TYPES:
+            if is_derived_from(o, t):
+                index[t].append(o)
+                break
+    return index
+
+
+def _get_document_index(doc):
+    # the index is dropped by the observer if objects are added or removed
+    index = _document_index.get(doc.Name)
+    if index is None:
+        _CacheObserver.attach()
+        index = _index_by_type(doc.Objects)
+        _document_index[doc.Name] = index
+    return index
+
+
+class _CacheObserver(object):
+    """document observer which invalidates the document type index"""
+
+    _instance = None
+
+    @classmethod
+    def attach(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+            FreeCAD.addDocumentObserver(cls._instance)
+
+    def slotCreatedObject(self, obj):
+        _document_index.pop(obj.Document.Name, None)
+
+    def slotDeletedObject(self, obj):
+        _document_index.pop(obj.Document.Name, None)
+
+    def slotDeletedDocument(self, doc):
+        _document_index.pop(doc.Name, None)
+
+
+def _iter_members(analysis, t):
     if analysis is None:
         raise ValueError("Analysis must not be None")
-    matching = []
     for m in analysis.Group:
         # since is _derived_from is used the father could be used
         # to test too (ex. "Fem::FemMeshObject")
         if is_derived_from(m, t):
-            matching.append(m)
-    return matching
+            yield m
+
+
+def get_member(analysis, t):
+    if analysis is None:
+        raise ValueError("Analysis must not be None")
+    # the iteration is done by filter, on Python 2 it already returns a list
+    # is_derived_from is cached, thus no C++ call is made for known types
+    return list(filter(lambda m: is_derived_from(m, t), analysis.Group))
 
 
 def get_single_member(analysis, t):
-    objs = get_member(analysis, t)
-    return objs[0] if objs else None
+    # stops at the first match
+    return next(_iter_members(analysis, t), None)
+
+
+def get_member_count(analysis, t):
+    return sum(1 for m in _iter_members(analysis, t))
 
 
 # collect analysis members used in CalculiX and Z88
 def get_several_member(analysis, t):
     # if no member is found, an empty list is returned
-    objs = get_member(analysis, t)
-    members = []
-    for m in objs:
-        obj_dict = {}
-        obj_dict["Object"] = m
-        obj_dict["RefShapeType"] = get_refshape_type(m)
-        members.append(obj_dict)
-    return members
+    # the writers add further keys to the member dicts, thus dicts are returned
+    return [
+        {"Object": m, "RefShapeType": get_refshape_type(m)}
+        for m in get_member(analysis, t)
+    ]
 
 
 def get_mesh_to_solve(analysis):
-    mesh_to_solve = None
-    for m in analysis.Group:
-        if m.isDerivedFrom("Fem::FemMeshObject") and not is_of_type(m, "Fem::FemMeshResult"):
-            if not mesh_to_solve:
-                mesh_to_solve = m
-            else:
-                return (None, "FEM: multiple mesh in analysis not yet supported!")
-    if mesh_to_solve is not None:
-        return (mesh_to_solve, "")
-    else:
+    meshes = [
+        m for m in analysis.Group
+        if is_derived_from(m, "Fem::FemMeshObject") and not is_of_type(m, "Fem::FemMeshResult")
+    ]
+    if not meshes:
         return (None, "FEM: no mesh object found in analysis.")
+    elif len(meshes) > 1:
+        return (None, "FEM: multiple mesh in analysis not yet supported!")
+    return (meshes[0], "")
 
 
 # typeID and object type defs
+# (TypeId, t) --> isDerivedFrom result, the inheritance of a TypeId never changes
+_derived_cache = {}
+
+
+def _proxy_type(obj):
+    """returns the Proxy.Type (None if there is none) and the TypeId of an object"""
+    proxy = getattr(obj, "Proxy", None)
+    ptype = getattr(proxy, "Type", None) if proxy is not None else None
+    return ptype, obj.TypeId
+
+
 def type_of_obj(obj):
     """returns objects TypeId (C++ objects) or Proxy.Type (Python objects)"""
-    if hasattr(obj, "Proxy") and hasattr(obj.Proxy, "Type"):
-        return obj.Proxy.Type
-    return obj.TypeId
+    ptype, type_id = _proxy_type(obj)
+    return type_id if ptype is None else ptype
 
 
 def is_of_type(obj, ty):
@@ -135,9 +211,15 @@ def is_derived_from(obj, t):
     # returns true for all FEM objects if given t == "App::DocumentObject"
     # since this is a father of the given object
     # see https://forum.freecadweb.org/viewtopic.php?f=10&t=32625
-    if (hasattr(obj, "Proxy") and hasattr(obj.Proxy, "Type") and obj.Proxy.Type == t):
+    ptype, type_id = _proxy_type(obj)
+    if ptype == t:
         return True
-    return obj.isDerivedFrom(t)
+    key = (type_id, t)
+    derived = _derived_cache.get(key)
+    if derived is None:
+        derived = obj.isDerivedFrom(t)
+        _derived_cache[key] = derived
+    return derived
 
 
 # ************************************************************************************************
@@ -145,20 +227,51 @@ def is_derived_from(obj, t):
 def get_pref_working_dir(solver_obj):
     # _dirTypes from run are not used
     # be aware beside could get an error if the document has not been saved
-    dir_setting = settings.get_dir_setting()
-    if dir_setting == settings.TEMPORARY:
-        setting_working_dir = get_temp_dir(solver_obj)
-    elif dir_setting == settings.BESIDE:
-        setting_working_dir = get_beside_dir(solver_obj)
-    elif dir_setting == settings.CUSTOM:
-        setting_working_dir = get_custom_dir(solver_obj)
-    else:
-        setting_working_dir = ""
-    return setting_working_dir
+    # an empty string is returned if no dir setting is set
+    return _DIR_DISPATCH.get(_cached_dir_setting(), lambda _obj: "")(solver_obj)
+
+
+# working dir preferences, dropped by the observer if the FEM general preferences change
+_dir_prefs = {}
+
+
+def invalidate_dir_settings():
+    _dir_prefs.clear()
+
+
+def _cached_dir_setting():
+    if "dir_setting" not in _dir_prefs:
+        _PreferenceObserver.attach()
+        _dir_prefs["dir_setting"] = settings.get_dir_setting()
+    return _dir_prefs["dir_setting"]
+
+
+def _cached_custom_dir():
+    if "custom_dir" not in _dir_prefs:
+        _PreferenceObserver.attach()
+        _dir_prefs["custom_dir"] = settings.get_custom_dir()
+    return _dir_prefs["custom_dir"]
+
+
+class _PreferenceObserver(object):
+    """parameter observer which invalidates the working dir preferences"""
+
+    _instance = None
+    # observers are only notified as long as the parameter group object lives
+    _param_group = None
+
+    @classmethod
+    def attach(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+            cls._param_group = settings.get_general_param_group()
+            cls._param_group.Attach(cls._instance)
+
+    def onChange(self, grp, reason=None):
+        invalidate_dir_settings()
 
 
 def get_temp_dir(obj=None):
-    from tempfile import mkdtemp
     return mkdtemp(prefix="fcfem_")
 
 
@@ -166,8 +279,7 @@ def get_beside_dir(obj):
     base = get_beside_base(obj)
     specific_path = os.path.join(base, obj.Label)
     # specific_path = getUniquePath(specific_path)
-    if not os.path.isdir(specific_path):
-        os.makedirs(specific_path)
+    _makedirs(specific_path)
     return specific_path
 
 
@@ -176,11 +288,27 @@ def get_custom_dir(obj):
     specific_path = os.path.join(
         base, obj.Document.Name, obj.Label)
     # specific_path = getUniquePath(specific_path)
-    if not os.path.isdir(specific_path):
-        os.makedirs(specific_path)
+    _makedirs(specific_path)
     return specific_path
 
 
+# dir setting --> function returning the working dir, used by get_pref_working_dir
+_DIR_DISPATCH = {
+    settings.TEMPORARY: get_temp_dir,
+    settings.BESIDE: get_beside_dir,
+    settings.CUSTOM: get_custom_dir,
+}
+
+
+def _makedirs(path):
+    # os.makedirs has no exist_ok on Python 2
+    try:
+        os.makedirs(path)
+    except OSError as e:
+        if e.errno != errno.EEXIST or not os.path.isdir(path):
+            raise
+
+
 def get_beside_base(obj):
     fcstdPath = obj.Document.FileName
     if fcstdPath == "":
@@ -203,7 +331,8 @@ def get_beside_base(obj):
 
 
 def get_custom_base(solver):
-    path = settings.get_custom_dir()
+    path = _cached_custom_dir()
+    # not cached, a missing dir must not be recreated by get_custom_dir
     if not os.path.isdir(path):
         error_message = "Selected working directory doesn't exist."
         FreeCAD.Console.PrintError(error_message + "\n")
@@ -220,11 +349,7 @@ def get_custom_base(solver):
 def check_working_dir(wdir):
     # check if working_dir exist, if not use a tmp dir and inform the user
     # print(wdir)
-    from os.path import isdir
-    if isdir(wdir):
-        return True
-    else:
-        return False
+    return os.path.isdir(wdir)
 
 
 class MustSaveError(Exception):
@@ -255,19 +380,26 @@ def get_part_to_mesh(mesh_obj):
 
 
 def getBoundBoxOfAllDocumentShapes(doc):
-    overalboundbox = None
+    # collect the bounds of all shapes and reduce them at once
+    bounds = []
+    add_bounds = bounds.append
     for o in doc.Objects:
         # netgen mesh obj has an attribute Shape which is an Document obj, which has no BB
-        if hasattr(o, "Shape") and hasattr(o.Shape, "BoundBox"):
-            try:
-                bb = o.Shape.BoundBox
-            except:
-                bb = None
-            if bb.isValid():
-                if not overalboundbox:
-                    overalboundbox = bb
-                overalboundbox.add(bb)
-    return overalboundbox
+        shape = getattr(o, "Shape", None)
+        if shape is None:
+            continue
+        try:
+            bb = getattr(shape, "BoundBox", None)
+        except Exception:
+            bb = None
+        if bb is not None and bb.isValid():
+            add_bounds((bb.XMin, bb.YMin, bb.ZMin, bb.XMax, bb.YMax, bb.ZMax))
+    if not bounds:
+        return None
+    bounds = np.asarray(bounds)
+    mins = bounds[:, :3].min(axis=0).tolist()
+    maxs = bounds[:, 3:].max(axis=0).tolist()
+    return FreeCAD.BoundBox(*(mins + maxs))
 
 
 def getSelectedFace(selectionex):
@@ -298,7 +430,7 @@ def get_refshape_type(fem_doc_object):
     # in GUI defined material_obj could have no RefShape and RefShapes could be different type
     # we're going to need the RefShapes to be the same type inside one fem_doc_object
     # TODO: check if all RefShapes inside the object really have the same type
-    import femmesh.meshtools as FemMeshTools
+    # the writers get the result from the RefShapeType of get_several_member
     if hasattr(fem_doc_object, "References") and fem_doc_object.References:
         first_ref_obj = fem_doc_object.References[0]
         first_ref_shape = FemMeshTools.get_element(first_ref_obj[0], first_ref_obj[1][0])
@@ -314,8 +446,10 @@ def get_refshape_type(fem_doc_object):
         return ""
 
 
-def pydecode(bytestring):
-    if sys.version_info.major < 3:
+# the Python version is checked once at import and not on every call
+if sys.version_info.major < 3:
+    def pydecode(bytestring):
         return bytestring
-    else:
+else:
+    def pydecode(bytestring):
         return bytestring.decode("utf-8")